@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+Conversion and memory-per-node benchmarks for the hierarchy parsers.
+
+Raw device dumps are rebuilt from the sample trees in `docs/treeData`, then
+widened by repeating the root's children so every platform is measured on a
+comparable node count.
+
+Usage:
+    python3 benchmarks/hierarchy_bench.py [--repeat 40] [--rounds 5]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Dict, Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from uiviewer.parser import android_hierarchy, ios_hierarchy, harmony_hierarchy  # noqa: E402
+from tests.samples import IOS_SCALE, load_sample, android_raw, ios_raw, harmony_raw  # noqa: E402
+
+
+def _widen(node: Dict, repeat: int) -> Dict:
+    node = copy.deepcopy(node)
+    node["children"] = node.get("children", []) * repeat
+    return node
+
+
+def _count(node: Dict) -> int:
+    return 1 + sum(_count(c) for c in node.get("children", []))
+
+
+def _retained_bytes(fn: Callable) -> int:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+
+def bench(name: str, nodes: int, build: Callable, convert: Callable, rounds: int):
+    build_s = min(timeit.repeat(build, number=1, repeat=rounds))
+    convert_s = min(timeit.repeat(convert, number=1, repeat=rounds))
+    tree_b = _retained_bytes(build)
+    dict_b = _retained_bytes(convert)
+    print(f"{name:<8} {nodes:>7} {build_s * 1e3:>10.2f} {convert_s * 1e3:>12.2f} "
+          f"{tree_b / nodes:>10.1f} {dict_b / nodes:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="hierarchy parser benchmarks")
+    parser.add_argument('--repeat', type=int, default=40, help='times to repeat the sample root children')
+    parser.add_argument('--rounds', type=int, default=5, help='timing rounds, best one is reported')
+    args = parser.parse_args()
+
+    android = _widen(load_sample("android"), args.repeat)
+    ios = _widen(load_sample("ios"), args.repeat)
+    harmony = _widen(load_sample("harmony"), args.repeat)
+
+    android_xml = android_raw(android)
+    ios_data = ios_raw(ios)
+    harmony_data = harmony_raw(harmony)
+
+    print(f"{'platform':<8} {'nodes':>7} {'tree(ms)':>10} {'to_dict(ms)':>12} {'tree B/n':>10} {'dict B/n':>10}")
+    bench("android", _count(android),
+          lambda: android_hierarchy.build_android_tree(android_xml),
+          lambda: android_hierarchy.convert_android_hierarchy(android_xml),
+          args.rounds)
+    bench("ios", _count(ios),
+          lambda: ios_hierarchy.build_ios_tree(ios_data, IOS_SCALE),
+          lambda: ios_hierarchy.convert_ios_hierarchy(ios_data, IOS_SCALE),
+          args.rounds)
+    bench("harmony", _count(harmony),
+          lambda: harmony_hierarchy.build_harmony_tree(harmony_data),
+          lambda: harmony_hierarchy.convert_harmony_hierarchy(harmony_data),
+          args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Import-time budget for the web server entry point.
+
+Runs `python -X importtime` in a fresh interpreter and fails when importing
+the API router takes longer than the budget, or when it pulls in any of the
+platform backends, which must only be loaded on first use.
+
+Usage:
+    python3 benchmarks/import_bench.py [--budget-ms 1000] [--module uiviewer.routers.api]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# top-level packages that belong to a platform backend
+BACKEND_PACKAGES = ("tidevice", "adbutils", "wda", "uiautomator2", "hmdriver2", "PIL")
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """
+    Returns the cumulative import time in microseconds of every module loaded by `import module`.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        env=env,
+        universal_newlines=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"import {module} failed")
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="uiviewer import-time budget")
+    parser.add_argument('--module', default="uiviewer.routers.api", help='module to import')
+    parser.add_argument('--budget-ms', type=float, default=1000, help='maximum cumulative import time')
+    args = parser.parse_args()
+
+    times = import_times(args.module)
+    total_ms = times.get(args.module, 0) / 1000
+    backends = sorted(name for name in times if name.split(".")[0] in BACKEND_PACKAGES)
+    slowest = sorted(times.items(), key=lambda kv: kv[1], reverse=True)[:10]
+
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, us in slowest:
+        print(f"  {us / 1000:>8.1f} ms  {name}")
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    if backends:
+        print(f"FAIL: platform backends imported eagerly: {', '.join(backends)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+Raw device dumps rebuilt from the sample trees in `docs/treeData`, shared by the
+tests and the benchmarks.
+"""
+
+import os
+import json
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IOS_SCALE = 2
+
+_ANDROID_ATTRS = {
+    'index': 'index',
+    'text': 'text',
+    'resourceId': 'resource-id',
+    '_type': 'class',
+    'description': 'content-desc',
+    'checkable': 'checkable',
+    'clickable': 'clickable',
+    'enabled': 'enabled',
+    'focusable': 'focusable',
+    'focused': 'focused',
+    'scrollable': 'scrollable',
+    'longClickable': 'long-clickable',
+    'password': 'password',
+    'selected': 'selected',
+}
+
+
+def load_sample(platform: str) -> Dict:
+    with open(os.path.join(ROOT, "docs", "treeData", f"{platform}.json"), encoding="utf-8") as f:
+        return json.load(f)["data"]["jsonHierarchy"]
+
+
+def _bounds(rect: Dict) -> str:
+    return f'[{rect["x"]},{rect["y"]}][{rect["x"] + rect["width"]},{rect["y"] + rect["height"]}]'
+
+
+def _xml_value(v) -> str:
+    v = str(v).lower() if isinstance(v, bool) else str(v)
+    return v.replace("&", "&amp;").replace('"', "&quot;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def android_raw(node: Dict, tag: str = "hierarchy") -> str:
+    """
+    uiautomator2 `dump_hierarchy` XML of a converted Android tree.
+    """
+    attrs = {_ANDROID_ATTRS[k]: v for k, v in node.items() if k in _ANDROID_ATTRS}
+    attrs['package'] = 'com.example'
+    if node.get("rect"):
+        attrs['bounds'] = _bounds(node["rect"])
+    attr_text = " ".join(f'{k}="{_xml_value(v)}"' for k, v in attrs.items())
+    children = "".join(android_raw(c, "node") for c in node.get("children", []))
+    return f'<{tag} {attr_text}>{children}</{tag}>'
+
+
+def ios_raw(node: Dict) -> Dict:
+    """
+    WDA `source(format="json")` data of a converted iOS tree, in points at IOS_SCALE.
+    """
+    raw = {k: v for k, v in node.items() if k not in ("_id", "_parentId", "_type", "id", "xpath", "children", "rect")}
+    raw["type"] = node.get("_type")
+    raw["rawIdentifier"] = node.get("id")
+    if node.get("rect"):
+        raw["rect"] = {k: v / IOS_SCALE for k, v in node["rect"].items()}
+    if node.get("children"):
+        raw["children"] = [ios_raw(c) for c in node["children"]]
+    return raw
+
+
+def harmony_raw(node: Dict) -> Dict:
+    """
+    hdc `dump_hierarchy` data of a converted HarmonyOS tree.
+    """
+    attributes = {}
+    for k, v in node.items():
+        if k in ("_id", "_parentId", "children", "rect"):
+            continue
+        attributes["type" if k == "_type" else k] = str(v).lower() if isinstance(v, bool) else str(v)
+    if node.get("rect"):
+        attributes["bounds"] = _bounds(node["rect"])
+    return {"attributes": attributes, "children": [harmony_raw(c) for c in node.get("children", [])]}
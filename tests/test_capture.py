@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import io
+
+from uiviewer._capture import Capturer, parse_wda_urls, format_report
+
+
+def test_parse_wda_urls():
+    assert parse_wda_urls([
+        "00008030-001A=http://192.168.1.10:8100",
+        "http://localhost:8100",
+    ]) == {
+        "00008030-001A": "http://192.168.1.10:8100",
+        None: "http://localhost:8100",
+    }
+
+
+def test_parse_wda_urls_with_equal_sign_in_url():
+    assert parse_wda_urls(["http://localhost:8100/?session=1"]) == {None: "http://localhost:8100/?session=1"}
+    assert parse_wda_urls(["00008030-001A=http://localhost:8100/?session=1"]) == {
+        "00008030-001A": "http://localhost:8100/?session=1"
+    }
+
+
+def test_parse_wda_urls_empty():
+    assert parse_wda_urls(None) == {}
+    assert parse_wda_urls([]) == {}
+
+
+def test_write_counts_encoded_bytes():
+    out = io.StringIO()
+    capturer = Capturer(["android"], "-")
+    capturer._write(out, 0, {"platform": "android", "serial": "s1", "screenshot": "画面"}, 1.5)
+    stats = capturer.stats[("android", "s1")]
+    assert stats.captures == 1
+    assert stats.bytes == len(out.getvalue().encode("utf-8")) > len(out.getvalue())
+    assert "raw MB" in format_report(capturer.stats)
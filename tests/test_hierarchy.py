@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+
+import pytest
+
+from uiviewer._models import BaseHierarchy
+from uiviewer.parser.tree import NodeTree
+from uiviewer.parser.xpath_lite import XPathLiteGenerator
+from uiviewer.parser.android_hierarchy import convert_android_hierarchy, build_android_tree
+from uiviewer.parser.ios_hierarchy import convert_ios_hierarchy, build_ios_tree
+from uiviewer.parser.harmony_hierarchy import convert_harmony_hierarchy, build_harmony_tree
+from tests.samples import ROOT, IOS_SCALE, load_sample, android_raw, ios_raw, harmony_raw
+
+
+PLATFORMS = ["android", "ios", "harmony"]
+
+
+def convert(platform, sample):
+    if platform == "android":
+        return convert_android_hierarchy(android_raw(sample))
+    if platform == "ios":
+        return convert_ios_hierarchy(ios_raw(sample), IOS_SCALE)
+    return convert_harmony_hierarchy(harmony_raw(sample))
+
+
+def build(platform, sample):
+    if platform == "android":
+        return build_android_tree(android_raw(sample))
+    if platform == "ios":
+        return build_ios_tree(ios_raw(sample), IOS_SCALE)
+    return build_harmony_tree(harmony_raw(sample))
+
+
+def strip_ids(node):
+    ret = {k: v for k, v in node.items() if k not in ("_id", "_parentId", "xpath", "children")}
+    if node.get("children"):
+        ret["children"] = [strip_ids(c) for c in node["children"]]
+    return ret
+
+
+def iter_nodes(node):
+    yield node
+    for child in node.get("children", []):
+        yield from iter_nodes(child)
+
+
+def expected_xpath_lite(platform):
+    with open(os.path.join(ROOT, "tests", "data", "xpath_lite.json"), encoding="utf-8") as f:
+        return json.load(f)[platform]
+
+
+@pytest.mark.parametrize("platform", PLATFORMS)
+def test_convert_matches_sample(platform):
+    sample = load_sample(platform)
+    converted = convert(platform, sample)
+    assert strip_ids(converted) == strip_ids(sample)
+
+
+@pytest.mark.parametrize("platform", PLATFORMS)
+def test_convert_links_parent_ids(platform):
+    converted = convert(platform, load_sample(platform))
+    assert converted["_parentId"] == ""
+    ids = set()
+    for node in iter_nodes(converted):
+        ids.add(node["_id"])
+        for child in node.get("children", []):
+            assert child["_parentId"] == node["_id"]
+    assert len(ids) == len(list(iter_nodes(converted)))
+
+
+@pytest.mark.parametrize("platform", PLATFORMS)
+def test_xpath_lite_from_dict_matches_baseline(platform):
+    sample = load_sample(platform)
+    generator = XPathLiteGenerator(platform, sample)
+    assert [generator.get_xpathLite(n["_id"]) for n in iter_nodes(sample)] == expected_xpath_lite(platform)
+
+
+@pytest.mark.parametrize("platform", PLATFORMS)
+def test_xpath_lite_from_tree_matches_baseline(platform):
+    tree = build(platform, load_sample(platform))
+    generator = XPathLiteGenerator(platform, tree)
+    assert [generator.get_xpathLite(tree.node_id(i)) for i in tree.walk()] == expected_xpath_lite(platform)
+
+
+@pytest.mark.parametrize("platform", PLATFORMS)
+def test_tree_dict_roundtrip(platform):
+    converted = convert(platform, load_sample(platform))
+    assert NodeTree.from_dict(converted).to_dict() == converted
+
+
+def test_harmony_negative_bounds():
+    data = {"children": [{"attributes": {"type": "Row", "bounds": "[-120,300][600,420]"}}]}
+    node = convert_harmony_hierarchy(data)["children"][0]
+    assert node["rect"] == {"x": -120, "y": 300, "width": 720, "height": 120}
+
+
+def test_harmony_missing_bounds():
+    data = {"children": [{"attributes": {"type": "Row"}}]}
+    node = convert_harmony_hierarchy(data)["children"][0]
+    assert node["rect"] == {"x": 0, "y": 0, "width": 0, "height": 0}
+
+
+def test_android_negative_and_missing_bounds():
+    xml = ('<hierarchy rotation="0">'
+           '<node class="A" bounds="[-10,0][100,50]" />'
+           '<node class="B" />'
+           '</hierarchy>')
+    first, second = convert_android_hierarchy(xml)["children"]
+    assert first["rect"] == {"x": -10, "y": 0, "width": 110, "height": 50}
+    assert "rect" not in second
+
+
+def test_ios_fractional_rect():
+    data = {"type": "Other", "rect": {"x": 0.5, "y": 1, "width": 10.5, "height": 2}}
+    node = convert_ios_hierarchy(data, 3)
+    assert node["rect"] == {"x": 1.5, "y": 3, "width": 31.5, "height": 6}
+
+
+def test_compact_hierarchy_keeps_tree():
+    tree = build("android", load_sample("android"))
+    hierarchy = BaseHierarchy.from_tree(tree, windowSize=(1080, 2400)).compact()
+    assert hierarchy.jsonHierarchy is None
+    assert hierarchy.tree is tree
+    assert hierarchy.windowSize == (1080, 2400)
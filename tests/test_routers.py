@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from uiviewer.routers.api import _etag_matches
+from uiviewer.routers.proxy import pick_worker
+
+
+ETAG = '"s-abc"'
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    (None, False),
+    ("", False),
+    ('"s-abc"', True),
+    ('W/"s-abc"', True),
+    ('"h-1", "s-abc"', True),
+    ('"h-1",W/"s-abc"', True),
+    ("*", True),
+    ('"s-abcd"', False),
+    ("s-abc", False),
+])
+def test_etag_matches(if_none_match, matches):
+    assert _etag_matches(if_none_match, ETAG) is matches
+
+
+WORKERS = [f"http://127.0.0.1:{8001 + i}" for i in range(4)]
+
+
+def test_pick_worker_is_stable():
+    serials = [f"emulator-{5554 + 2 * i}" for i in range(50)]
+    first = [pick_worker(WORKERS, s) for s in serials]
+    assert [pick_worker(list(WORKERS), s) for s in serials] == first
+    assert set(first) <= set(WORKERS)
+    assert len(set(first)) > 1
+
+
+def test_pick_worker_single():
+    assert pick_worker(WORKERS[:1], "any") == WORKERS[0]
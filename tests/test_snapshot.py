@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from PIL import Image, ImageDraw
+
+from uiviewer._models import BaseHierarchy
+from uiviewer._snapshot import RawScreenshot, Snapshot, SnapshotCache, perceptual_hash, hamming_distance
+from uiviewer.parser.tree import NodeTree, NO_NODE
+
+
+WIDTH, HEIGHT = 100, 200
+
+
+def make_tree():
+    tree = NodeTree()
+    root = tree.add(NO_NODE, "Root", rect=(0, 0, WIDTH, HEIGHT))
+    tree.add(root, "A", rect=(0, 0, 40, 20))        # 1
+    tree.add(root, "B", rect=(50, 0, 30, 60))       # 2
+    tree.add(root, "C", rect=(-10, 190, 20, 30))    # 3: sticks out left and bottom
+    tree.add(root, "D", rect=(150, 0, 10, 10))      # 4: off screen
+    tree.add(root, "E")                             # 5: no bounds
+    tree.add(root, "F", rect=(10, 100, 0, 20))      # 6: zero width
+    return tree
+
+
+def make_image(width=WIDTH, height=HEIGHT):
+    # a distinct color per 10x10 cell, so crops can be told apart
+    img = Image.new("RGB", (width, height))
+    draw = ImageDraw.Draw(img)
+    for x in range(0, width, 10):
+        for y in range(0, height, 10):
+            draw.rectangle((x, y, x + 9, y + 9), fill=(x, y, 255 - x))
+    return img
+
+
+def make_snapshot(image=None, window_size=(WIDTH, HEIGHT), scale=1):
+    snapshot = Snapshot("s", RawScreenshot(image=image or make_image()))
+    snapshot.attach(BaseHierarchy.from_tree(make_tree(), windowSize=window_size, scale=scale))
+    return snapshot
+
+
+def test_pixel_scale():
+    assert make_snapshot().pixel_scale() == 1
+    # iOS: rects are in pixels (points * scale), the screenshot is half size
+    snapshot = make_snapshot(make_image(WIDTH // 2, HEIGHT // 2), window_size=(WIDTH // 2, HEIGHT // 2), scale=2)
+    assert snapshot.pixel_scale() == 0.5
+    assert snapshot.crop_box("2") == (25, 0, 40, 30)
+
+
+def test_pixel_scale_without_hierarchy():
+    assert Snapshot("s", RawScreenshot(image=make_image())).pixel_scale() == 1
+
+
+def test_crop_box():
+    snapshot = make_snapshot()
+    assert snapshot.crop_box("0") == (0, 0, WIDTH, HEIGHT)
+    assert snapshot.crop_box("2") == (50, 0, 80, 60)
+
+
+def test_crop_box_clips_to_screenshot():
+    # [-10,190][10,220] on a 100x200 screen
+    assert make_snapshot().crop_box("3") == (0, 190, 10, 200)
+
+
+@pytest.mark.parametrize("node_id", ["4", "5", "6", "99", "x"])
+def test_crop_box_invisible_or_unknown(node_id):
+    assert make_snapshot().crop_box(node_id) is None
+
+
+def test_crop_box_without_hierarchy():
+    assert Snapshot("s", RawScreenshot(image=make_image())).crop_box("0") is None
+
+
+def test_crop():
+    snapshot = make_snapshot()
+    img = snapshot.crop("2")
+    assert img.size == (30, 60)
+    assert img.tobytes() == snapshot.image.crop((50, 0, 80, 60)).tobytes()
+    assert snapshot.crop("4") is None
+
+
+def _overlaps(a, b):
+    return (a["x"] < b["x"] + b["width"] and b["x"] < a["x"] + a["width"]
+            and a["y"] < b["y"] + b["height"] and b["y"] < a["y"] + a["height"])
+
+
+@pytest.mark.parametrize("padding", [0, 3])
+def test_sprite(padding):
+    snapshot = make_snapshot()
+    sheet, offsets, missing = snapshot.sprite(["1", "2", "3", "2", "4", "5", "99"], padding)
+
+    assert list(offsets) == ["2", "1", "3"]  # deduplicated, packed tallest first
+    assert missing == ["4", "5", "99"]
+    sizes = {k: (o["width"], o["height"]) for k, o in offsets.items()}
+    assert sizes == {"1": (40, 20), "2": (30, 60), "3": (10, 10)}
+
+    boxes = list(offsets.values())
+    for i, a in enumerate(boxes):
+        assert a["x"] + a["width"] <= sheet.width and a["y"] + a["height"] <= sheet.height
+        for b in boxes[i + 1:]:
+            padded = {**a, "width": a["width"] + padding, "height": a["height"] + padding}
+            assert not _overlaps(padded, b)
+
+    for node_id, o in offsets.items():
+        piece = sheet.crop((o["x"], o["y"], o["x"] + o["width"], o["y"] + o["height"]))
+        assert piece.tobytes() == snapshot.crop(node_id).tobytes()
+
+
+def test_sprite_wraps_shelves():
+    snapshot = make_snapshot()
+    sheet, offsets, _ = snapshot.sprite(["0", "1", "2"])
+    # about square: sqrt(100*200 + 40*20 + 30*60) = 150 wide, "1" does not fit next to "2"
+    assert sheet.size == (150, HEIGHT + 20)
+    assert offsets["0"] == {"x": 0, "y": 0, "width": WIDTH, "height": HEIGHT}
+    assert offsets["2"] == {"x": WIDTH, "y": 0, "width": 30, "height": 60}
+    assert offsets["1"] == {"x": 0, "y": HEIGHT, "width": 40, "height": 20}
+
+
+def test_sprite_nothing_to_crop():
+    assert make_snapshot().sprite(["4", "99"]) == (None, {}, ["4", "99"])
+
+
+def shifted(image, dx):
+    # the same picture, a little brighter: every pixel differs, the dHash does not
+    return image.point(lambda v: min(255, v + dx))
+
+
+def record(cache, image):
+    return cache.update_screenshot(RawScreenshot(image=image))
+
+
+def dump(cache, snapshot_id, body=b"{}"):
+    return cache.update_hierarchy(BaseHierarchy.from_tree(make_tree(), windowSize=(WIDTH, HEIGHT)), body, snapshot_id)
+
+
+def test_perceptual_hash():
+    image = make_image()
+    assert perceptual_hash(image) == perceptual_hash(shifted(image, 1))
+    assert hamming_distance(perceptual_hash(image), perceptual_hash(image.rotate(180))) > 16
+
+
+def test_update_screenshot_encodes_lazily(monkeypatch):
+    calls = []
+    to_base64 = RawScreenshot.to_base64
+    monkeypatch.setattr(RawScreenshot, "to_base64", lambda self: calls.append(1) or to_base64(self))
+
+    cache = SnapshotCache()
+    image = make_image()
+    first = record(cache, image)
+    assert calls == []
+    assert cache.screenshot_etag == f'"s-{first}"'
+    data = cache.screenshot_base64()
+    assert record(cache, image.copy()) == first
+    assert cache.screenshot_base64() == data
+    assert len(calls) == 1
+
+    second = record(cache, shifted(image, 1))
+    assert second != first
+    assert cache.screenshot_base64() != data
+    assert len(calls) == 2
+
+
+def test_update_screenshot_keeps_last_snapshots():
+    cache = SnapshotCache()
+    ids = [record(cache, shifted(make_image(), dx)) for dx in range(3)]
+    assert list(cache.snapshots) == ids[1:]
+    assert cache.get_snapshot(ids[0]) is None
+
+
+def test_hierarchy_reusable_exact_id():
+    cache = SnapshotCache()
+    image = make_image()
+    first = record(cache, image)
+    assert not cache.hierarchy_reusable(first)
+    etag = dump(cache, first)
+    assert cache.hierarchy_reusable(first)
+    assert cache.reuse_hierarchy(first) == (etag, b"{}")
+    assert not cache.hierarchy_reusable(None)
+
+    second = record(cache, shifted(image, 1))
+    assert not cache.hierarchy_reusable(second)
+
+
+def test_hierarchy_reusable_phash_distance():
+    cache = SnapshotCache()
+    image = make_image()
+    dump(cache, record(cache, image))
+    similar = record(cache, shifted(image, 1))
+    assert cache.hierarchy_reusable(similar, max_distance=0)
+
+    different = record(cache, image.rotate(180))
+    assert not cache.hierarchy_reusable(different, max_distance=4)
+    assert cache.hierarchy_reusable(different, max_distance=64)
+
+
+def test_hierarchy_reusable_after_eviction():
+    cache = SnapshotCache()
+    image = make_image()
+    first = record(cache, image)
+    dump(cache, first)
+    record(cache, image.rotate(90))
+    latest = record(cache, shifted(image, 1))
+    # evicted before its hash was ever needed: no lossy reuse, exact reuse still works
+    assert cache.get_snapshot(first) is None
+    assert not cache.hierarchy_reusable(latest, max_distance=64)
+    assert cache.hierarchy_reusable(first)
+
+
+def test_hierarchy_phash_survives_eviction():
+    cache = SnapshotCache()
+    image = make_image()
+    dump(cache, record(cache, image))
+    assert not cache.hierarchy_reusable(record(cache, image.rotate(180)), max_distance=4)
+    latest = record(cache, shifted(image, 1))
+    assert cache.hierarchy_reusable(latest, max_distance=0)
+
+
+def test_update_hierarchy_pairs_with_cached_snapshot():
+    cache = SnapshotCache()
+    first = record(cache, make_image())
+    dump(cache, first)
+    snapshot = cache.get_snapshot(first)
+    assert snapshot.tree is not None
+    assert snapshot.hierarchy.jsonHierarchy is None
+
+    # unknown snapshot: neither reusable nor attached
+    dump(cache, "unknown", b"[]")
+    assert cache.hierarchy_snapshot_id is None
+    assert not cache.hierarchy_reusable("unknown")
+    assert not cache.hierarchy_reusable(first)
@@ -1,30 +1,28 @@
 # -*- coding: utf-8 -*-
 
 import os
+import time
+import socket
 import webbrowser
+import urllib.request
 import uvicorn
 import threading
+import multiprocessing
+from typing import List, Optional
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 
-from uiviewer.routers import api
+from uiviewer.routers import api, proxy
 from uiviewer._models import ApiResponse
-
-
-app = FastAPI()
+from uiviewer._logger import logger
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 static_dir = os.path.join(current_dir, "static")
 
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
-
-app.include_router(api.router)
 
-
-@app.exception_handler(Exception)
 def global_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
         status_code=500,
@@ -32,7 +30,6 @@ def global_exception_handler(request: Request, exc: Exception):
     )
 
 
-@app.exception_handler(HTTPException)
 def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
@@ -40,17 +37,110 @@ def http_exception_handler(request: Request, exc: HTTPException):
     )
 
 
+def create_app(workers: Optional[List[str]] = None) -> FastAPI:
+    """
+    Args:
+    workers (Optional[List[str]]): Worker base urls. When given, per-device
+        requests are dispatched to the worker owning the device serial.
+    """
+    app = FastAPI()
+    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+    if workers:
+        app.include_router(proxy.build_router(workers))
+    app.include_router(api.router)
+    app.add_exception_handler(Exception, global_exception_handler)
+    app.add_exception_handler(HTTPException, http_exception_handler)
+    return app
+
+
+app = create_app()
+
+
 def open_browser(port):
     webbrowser.open_new(f"http://127.0.0.1:{port}")
 
 
-def run(port=8000):
-    timer = threading.Timer(1.0, open_browser, args=[port])
-    timer.daemon = True
-    timer.start()
+def _schedule_browser(browser: bool, port: int):
+    if browser:
+        timer = threading.Timer(1.0, open_browser, args=[port])
+        timer.daemon = True
+        timer.start()
+
 
+def _run_worker(port: int):
     uvicorn.run(app, host="127.0.0.1", port=port)
 
 
+def _check_port_free(port: int):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(("127.0.0.1", port))
+        except OSError as e:
+            raise RuntimeError(f"Worker port {port} is not available: {e}")
+
+
+def _wait_for_workers(processes: List[multiprocessing.Process], ports: List[int], timeout: float = 30):
+    """
+    Blocks until every worker answers /health, failing fast if one exits or times out.
+    """
+    deadline = time.monotonic() + timeout
+    pending = dict(zip(ports, processes))
+    while pending:
+        for port, p in list(pending.items()):
+            if not p.is_alive():
+                raise RuntimeError(f"Worker on port {port} exited with code {p.exitcode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                    del pending[port]
+            except OSError:
+                pass
+        if pending and time.monotonic() > deadline:
+            raise RuntimeError(f"Workers on ports {sorted(pending)} did not start within {timeout}s")
+        time.sleep(0.2)
+
+
+def run(port=8000, host="127.0.0.1", workers=1, browser=True):
+    """
+    Args:
+    port (int): Listen port of the web UI.
+    host (str): Listen host of the web UI.
+    workers (int): Worker processes. With more than one, each worker owns a
+        fixed share of the devices and listens on 127.0.0.1 at port+1..port+workers.
+    browser (bool): Whether to open the web UI in the browser.
+    """
+    if workers <= 1:
+        _schedule_browser(browser, port)
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    worker_ports = [port + i for i in range(1, workers + 1)]
+    processes = []
+    try:
+        for worker_port in worker_ports:
+            _check_port_free(worker_port)
+        for worker_port in worker_ports:
+            p = ctx.Process(target=_run_worker, args=(worker_port,), daemon=True)
+            p.start()
+            processes.append(p)
+        _wait_for_workers(processes, worker_ports)
+    except RuntimeError as e:
+        logger.error(str(e))
+        for p in processes:
+            p.terminate()
+        raise SystemExit(1)
+    logger.info(f"Started {workers} workers on ports {worker_ports[0]}-{worker_ports[-1]}")
+    _schedule_browser(browser, port)
+
+    try:
+        front = create_app([f"http://127.0.0.1:{p}" for p in worker_ports])
+        uvicorn.run(front, host=host, port=port)
+    finally:
+        for p in processes:
+            p.terminate()
+        for p in processes:
+            p.join()
+
+
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
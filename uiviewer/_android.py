@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from typing import List, Tuple
+from functools import cached_property  # python3.8+
+
+import adbutils
+import uiautomator2 as u2
+
+from uiviewer._device import DeviceMeta
+from uiviewer._snapshot import RawScreenshot
+from uiviewer._models import BaseHierarchy
+from uiviewer.parser import android_hierarchy
+
+
+def list_serials() -> List[str]:
+    raws = adbutils.AdbClient().device_list()
+    return [item.serial for item in raws]
+
+
+class AndroidDevice(DeviceMeta):
+    def __init__(self, serial: str):
+        self.serial = serial
+        self.d: u2.Device = u2.connect(serial)
+
+    @cached_property
+    def _window_size(self) -> Tuple:
+        return self.d.window_size()
+
+    def capture_screenshot(self) -> RawScreenshot:
+        return RawScreenshot(image=self.d.screenshot())
+
+    def dump_hierarchy(self) -> BaseHierarchy:
+        current = self.d.app_current()
+        page_xml = self.d.dump_hierarchy()
+        tree = android_hierarchy.build_android_tree(page_xml)
+        return BaseHierarchy.from_tree(
+            tree,
+            activityName=current['activity'],
+            packageName=current['package'],
+            windowSize=self._window_size,
+            scale=1
+        )
+
+
+def get_device(serial: str, wda_url: str, max_depth: int) -> AndroidDevice:
+    return AndroidDevice(serial)
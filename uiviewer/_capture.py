@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import itertools
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, IO
+
+from uiviewer._logger import logger
+from uiviewer._device import DeviceMeta, list_serials, get_device
+from uiviewer._models import Platform
+from uiviewer.parser.tree import NodeTree
+from uiviewer.parser.xpath_lite import XPathLiteGenerator
+
+
+@dataclass
+class CaptureStats:
+    captures: int = 0
+    failures: int = 0
+    seconds: float = 0
+    # size of the written records before any gzip compression
+    bytes: int = 0
+    last_error: Optional[str] = None
+
+
+def _error_message(e: Exception) -> str:
+    # HTTPException raised by the device registry keeps its message in `detail`
+    return str(getattr(e, "detail", None) or e)
+
+
+def parse_wda_urls(values: List[str]) -> Dict[Optional[str], str]:
+    """
+    Parses `--wda-url` values: `UDID=URL` binds a WDA url to one device, a bare
+    URL is used for every iOS device without its own entry.
+    """
+    urls = {}
+    for value in values or []:
+        udid, sep, url = value.partition("=")
+        if sep and not udid.startswith("http"):
+            urls[udid] = url
+        else:
+            urls[None] = value
+    return urls
+
+
+def discover(platforms: List[str]) -> List[Tuple[str, str]]:
+    targets = []
+    for platform in platforms:
+        try:
+            serials = list_serials(platform)
+        except Exception as e:
+            logger.error(f"list {platform} devices failed: {_error_message(e)}")
+            continue
+        logger.info(f"{platform}: {len(serials)} device(s)")
+        targets.extend((platform, serial) for serial in serials)
+    return targets
+
+
+def all_xpath_lite(platform: str, tree: NodeTree) -> Dict[str, str]:
+    """
+    XPathLite of every node, keyed by node `_id`.
+    """
+    generator = XPathLiteGenerator(platform, tree)
+    return {tree.node_id(i): generator.get_xpathLite(tree.node_id(i)) for i in tree.walk()}
+
+
+def capture_device(platform: str, serial: str, device: DeviceMeta, with_xpath: bool) -> Dict:
+    # screenshot first, then hierarchy, like the web UI does
+    timestamp = time.time()
+    screenshot = device.take_screenshot()
+    hierarchy = device.dump_hierarchy()
+    record = {
+        "platform": platform,
+        "serial": serial,
+        "timestamp": timestamp,
+        "screenshot": screenshot,
+        "hierarchy": hierarchy.dict(),
+    }
+    if with_xpath and hierarchy.tree:
+        record["xpathLite"] = all_xpath_lite(platform, hierarchy.tree)
+    return record
+
+
+def _open_output(path: str) -> IO[str]:
+    if path == "-":
+        return sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, "at", encoding="utf-8")
+    return open(path, "a", encoding="utf-8")
+
+
+class Capturer:
+    """
+    Captures screenshot + hierarchy from many devices concurrently and streams
+    one NDJSON record per device and round.
+    """
+
+    def __init__(
+        self,
+        platforms: List[str],
+        output: str,
+        jobs: int = 4,
+        wda_urls: Optional[Dict[Optional[str], str]] = None,
+        max_depth: Optional[int] = None,
+        with_xpath: bool = True
+    ):
+        self.platforms = platforms
+        self.output = output
+        self.jobs = jobs
+        self.wda_urls = wda_urls or {}
+        self.max_depth = max_depth
+        self.with_xpath = with_xpath
+        self.devices: Dict[Tuple[str, str], DeviceMeta] = {}
+        self.stats: Dict[Tuple[str, str], CaptureStats] = {}
+
+    def _device(self, platform: str, serial: str) -> DeviceMeta:
+        key = (platform, serial)
+        if key not in self.devices:
+            wda_url = self.wda_urls.get(serial, self.wda_urls.get(None))
+            if platform == Platform.IOS and not wda_url:
+                raise ValueError(f"no wdaUrl for iOS device<{serial}>")
+            self.devices[key] = get_device(platform, serial, wda_url, self.max_depth)
+        return self.devices[key]
+
+    def _capture_one(self, platform: str, serial: str) -> Tuple[Dict, float]:
+        start = time.perf_counter()
+        try:
+            record = capture_device(platform, serial, self._device(platform, serial), self.with_xpath)
+        except Exception as e:
+            logger.debug(traceback.format_exc())
+            # drop the connection, it is rebuilt on the next round
+            self.devices.pop((platform, serial), None)
+            record = {"platform": platform, "serial": serial, "timestamp": time.time(), "error": _error_message(e)}
+        return record, time.perf_counter() - start
+
+    def _write(self, out: IO[str], round_no: int, record: Dict, seconds: float) -> None:
+        record["round"] = round_no
+        record["seconds"] = round(seconds, 3)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        out.write(line)
+        out.flush()
+
+        stats = self.stats.setdefault((record["platform"], record["serial"]), CaptureStats())
+        stats.seconds += seconds
+        if "error" in record:
+            stats.failures += 1
+            stats.last_error = record["error"]
+            logger.error(f"{record['platform']}<{record['serial']}> capture failed: {record['error']}")
+        else:
+            stats.captures += 1
+            stats.bytes += len(line.encode("utf-8"))
+
+    def run_round(self, out: IO[str], round_no: int) -> None:
+        targets = iter(discover(self.platforms))
+        jobs = max(1, self.jobs)
+        pool = ThreadPoolExecutor(max_workers=jobs)
+        pending = set()
+        try:
+            while True:
+                # only `jobs` devices are in flight, so an interrupt does not wait for the rest
+                for platform, serial in itertools.islice(targets, jobs - len(pending)):
+                    pending.add(pool.submit(self._capture_one, platform, serial))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                # written from this thread only, in completion order
+                for future in done:
+                    self._write(out, round_no, *future.result())
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def run(self, rounds: int = 1, interval: float = 0) -> Dict[Tuple[str, str], CaptureStats]:
+        """
+        Args:
+        rounds (int): Capture rounds, 0 means until interrupted.
+        interval (float): Seconds between the starts of two rounds.
+
+        Returns:
+        Dict[Tuple[str, str], CaptureStats]: Per-device statistics.
+        """
+        out = _open_output(self.output)
+        round_no = 0
+        try:
+            while rounds <= 0 or round_no < rounds:
+                started = time.monotonic()
+                self.run_round(out, round_no)
+                round_no += 1
+                if rounds > 0 and round_no >= rounds:
+                    break
+                time.sleep(max(0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            logger.info("capture interrupted")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return self.stats
+
+
+def format_report(stats: Dict[Tuple[str, str], CaptureStats]) -> str:
+    lines = [f"{'platform':<8} {'serial':<28} {'ok':>5} {'fail':>5} {'avg(s)':>8} {'cap/min':>8} {'raw MB':>8}  last error"]
+    for (platform, serial), s in sorted(stats.items()):
+        total = s.captures + s.failures
+        avg = s.seconds / total if total else 0
+        per_min = 60 * s.captures / s.seconds if s.seconds else 0
+        lines.append(f"{platform:<8} {serial:<28} {s.captures:>5} {s.failures:>5} {avg:>8.2f} {per_min:>8.1f} "
+                     f"{s.bytes / 1e6:>8.2f}  {s.last_error or ''}")
+    return "\n".join(lines)
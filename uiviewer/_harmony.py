@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import contextlib
+from typing import List, Dict, Tuple, Iterator
+from functools import cached_property  # python3.8+
+
+from hmdriver2 import hdc
+
+from uiviewer._device import DeviceMeta
+from uiviewer._snapshot import RawScreenshot
+from uiviewer._models import BaseHierarchy
+from uiviewer.parser import harmony_hierarchy
+
+
+def list_serials() -> List[str]:
+    return hdc.list_devices()
+
+
+class HarmonyDevice(DeviceMeta):
+    def __init__(self, serial: str):
+        self.serial = serial
+        self.hdc = hdc.HdcWrapper(serial)
+
+    @cached_property
+    def _display_size(self) -> Tuple:
+        return self.hdc.display_size()
+
+    @contextlib.contextmanager
+    def _screenshot_file(self) -> Iterator[str]:
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
+        try:
+            # adapt windows
+            temp_file.close()
+            path = temp_file.name
+            self.hdc.screenshot(path)
+            yield path
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def capture_screenshot(self) -> RawScreenshot:
+        # keep the PNG as is, it is only decoded when pixels are needed
+        with self._screenshot_file() as path:
+            with open(path, "rb") as f:
+                return RawScreenshot(png=f.read())
+
+    def dump_hierarchy(self) -> BaseHierarchy:
+        packageName, pageName = self.hdc.current_app()
+        raw: Dict = self.hdc.dump_hierarchy()
+        tree = harmony_hierarchy.build_harmony_tree(raw)
+        return BaseHierarchy.from_tree(
+            tree,
+            activityName=pageName,
+            packageName=packageName,
+            windowSize=self._display_size,
+            scale=1
+        )
+
+
+def get_device(serial: str, wda_url: str, max_depth: int) -> HarmonyDevice:
+    return HarmonyDevice(serial)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from typing import List, Dict, Tuple
+from functools import cached_property  # python3.8+
+
+from requests import request
+import tidevice
+import wda
+
+from uiviewer._device import DeviceMeta
+from uiviewer._snapshot import RawScreenshot
+from uiviewer._models import BaseHierarchy
+from uiviewer.parser import ios_hierarchy
+
+
+def list_serials() -> List[str]:
+    raw = tidevice.Usbmux().device_list()
+    return [d.udid for d in raw]
+
+
+class IosDevice(DeviceMeta):
+    def __init__(self, udid: str, wda_url: str, max_depth: int) -> None:
+        self.udid = udid
+        self.wda_url = wda_url
+        self._max_depth = max_depth
+        self.client = wda.Client(wda_url)
+
+    @property
+    def max_depth(self) -> int:
+        return int(self._max_depth) if self._max_depth else 30
+
+    @cached_property
+    def scale(self) -> int:
+        return self.client.scale
+
+    @cached_property
+    def _window_size(self) -> Tuple:
+        return self.client.window_size()
+
+    def _check_wda_health(self) -> bool:
+        resp = request("GET", f"{self.wda_url}/status", timeout=5).json()
+        state = resp.get("value", {}).get("state")
+        return state == "success"
+
+    def capture_screenshot(self) -> RawScreenshot:
+        return RawScreenshot(image=self.client.screenshot())
+
+    def _current_bundle_id(self) -> str:
+        resp = request("GET", f"{self.wda_url}/wda/activeAppInfo", timeout=10).json()
+        bundleId = resp.get("value", {}).get("bundleId", None)
+        return bundleId
+
+    def dump_hierarchy(self) -> BaseHierarchy:
+        self.client.appium_settings({"snapshotMaxDepth": self.max_depth})
+        data: Dict = self.client.source(format="json")
+        tree = ios_hierarchy.build_ios_tree(data, self.scale)
+        return BaseHierarchy.from_tree(
+            tree,
+            activityName=None,
+            packageName=self._current_bundle_id(),
+            windowSize=self._window_size,
+            scale=self.scale
+        )
+
+
+def get_device(serial: str, wda_url: str, max_depth: int) -> IosDevice:
+    return IosDevice(serial, wda_url, max_depth)
@@ -2,8 +2,10 @@
 
 import enum
 
-from pydantic import BaseModel
-from typing import Any, Union, Dict, Tuple, Optional
+from pydantic import BaseModel, PrivateAttr
+from typing import Any, Union, Dict, Tuple, Optional, List
+
+from uiviewer.parser.tree import NodeTree
 
 
 class Platform(str, enum.Enum):
@@ -32,8 +34,37 @@ class BaseHierarchy(BaseModel):
     scale: int = 1
     activityName: Optional[str] = None
     packageName: Optional[str] = None
+    # the NodeTree jsonHierarchy was serialized from, not part of the response
+    _tree: Optional[NodeTree] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_tree(cls, tree: NodeTree, **kwargs) -> "BaseHierarchy":
+        hierarchy = cls(jsonHierarchy=tree.to_dict(), **kwargs)
+        hierarchy._tree = tree
+        return hierarchy
+
+    @property
+    def tree(self) -> Optional[NodeTree]:
+        if self._tree is None and self.jsonHierarchy:
+            self._tree = NodeTree.from_dict(self.jsonHierarchy)
+        return self._tree
+
+    def compact(self) -> "BaseHierarchy":
+        """
+        A copy without `jsonHierarchy`, for keeping a hierarchy around once it has
+        been serialized: `tree` still works, at a fraction of the nested dict's memory.
+        """
+        tree = self.tree
+        hierarchy = self.copy(update={"jsonHierarchy": None})
+        hierarchy._tree = tree
+        return hierarchy
 
 
 class XPathLiteRequest(BaseModel):
     tree_data: Dict[str, Any]
-    node_id: str
\ No newline at end of file
+    node_id: str
+
+
+class SpriteRequest(BaseModel):
+    node_ids: List[str]
+    padding: int = 0
\ No newline at end of file
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+import math
+import hashlib
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional, TYPE_CHECKING
+
+from uiviewer._utils import image2base64, bytes2base64
+from uiviewer._models import BaseHierarchy
+from uiviewer.parser.tree import NodeTree
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+def fast_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def perceptual_hash(image: "Image.Image") -> int:
+    """
+    64-bit difference hash: each bit tells whether a pixel of the 9x8 grayscale
+    thumbnail is brighter than its right neighbour.
+    """
+    pixels = image.convert("L").resize((9, 8)).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            offset = row * 9 + col
+            bits = (bits << 1) | (pixels[offset] > pixels[offset + 1])
+    return bits
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class RawScreenshot:
+    """
+    A screenshot as the device returned it: a decoded image (Android, iOS) or the
+    PNG file bytes (HarmonyOS). The other form is only produced when needed.
+    """
+
+    __slots__ = ("_image", "_png")
+
+    def __init__(self, image: Optional["Image.Image"] = None, png: Optional[bytes] = None):
+        self._image = image
+        self._png = png
+
+    @property
+    def image(self) -> "Image.Image":
+        if self._image is None:
+            from PIL import Image
+
+            img = Image.open(BytesIO(self._png))
+            img.load()
+            self._image = img
+        return self._image
+
+    def fingerprint(self) -> str:
+        return fast_hash(self._png if self._png is not None else self._image.tobytes())
+
+    def to_base64(self) -> str:
+        if self._png is not None:
+            return bytes2base64(self._png)
+        return image2base64(self._image)
+
+
+class Snapshot:
+    """
+    A screenshot, plus the hierarchy that was dumped for it.
+    """
+
+    __slots__ = ("snapshot_id", "screenshot", "hierarchy", "_phash")
+
+    def __init__(self, snapshot_id: str, screenshot: RawScreenshot):
+        self.snapshot_id = snapshot_id
+        self.screenshot = screenshot
+        self.hierarchy: Optional[BaseHierarchy] = None
+        self._phash: Optional[int] = None
+
+    @property
+    def image(self) -> "Image.Image":
+        return self.screenshot.image
+
+    @property
+    def phash(self) -> int:
+        if self._phash is None:
+            self._phash = perceptual_hash(self.image)
+        return self._phash
+
+    def attach(self, hierarchy: BaseHierarchy):
+        self.hierarchy = hierarchy
+
+    @property
+    def tree(self) -> Optional[NodeTree]:
+        return self.hierarchy.tree if self.hierarchy is not None else None
+
+    def pixel_scale(self) -> float:
+        """
+        Screenshot pixels per hierarchy rect unit. Rects are already multiplied by
+        `BaseHierarchy.scale`, so this is 1 unless the screenshot was resized.
+        """
+        if self.hierarchy is None or not max(self.hierarchy.windowSize):
+            return 1
+        return max(self.image.size) / (max(self.hierarchy.windowSize) * self.hierarchy.scale)
+
+    def crop_box(self, node_id: str) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Gets the screenshot box (left, upper, right, lower) of a node, clipped to the
+        screenshot, or None if the node is unknown or has no visible area.
+        """
+        tree = self.tree
+        index = tree.index_of(node_id) if tree else None
+        rect = tree.rect(index) if index is not None else None
+        if not rect:
+            return None
+        factor = self.pixel_scale()
+        x, y, width, height = (v * factor for v in rect)
+        left, upper = max(0, round(x)), max(0, round(y))
+        right, lower = min(self.image.width, round(x + width)), min(self.image.height, round(y + height))
+        if right <= left or lower <= upper:
+            return None
+        return left, upper, right, lower
+
+    def crop(self, node_id: str) -> Optional["Image.Image"]:
+        box = self.crop_box(node_id)
+        return self.image.crop(box) if box else None
+
+    def sprite(self, node_ids: List[str], padding: int = 0) -> Tuple[Optional["Image.Image"], Dict[str, Dict], List[str]]:
+        """
+        Packs the crops of many nodes into one image, shelf by shelf.
+
+        Returns:
+        Tuple: The sprite image (None if nothing could be cropped), the
+            {node_id: {x, y, width, height}} offsets in the sprite, and the missing node ids.
+        """
+        from PIL import Image
+
+        boxes, missing = {}, []
+        for node_id in dict.fromkeys(node_ids):
+            box = self.crop_box(node_id)
+            if box:
+                boxes[node_id] = box
+            else:
+                missing.append(node_id)
+        if not boxes:
+            return None, {}, missing
+
+        sizes = {k: (b[2] - b[0], b[3] - b[1]) for k, b in boxes.items()}
+        area = sum((w + padding) * (h + padding) for w, h in sizes.values())
+        sheet_width = max(max(w for w, _ in sizes.values()), int(math.sqrt(area)))
+
+        offsets = {}
+        x = y = shelf_height = 0
+        for node_id in sorted(sizes, key=lambda k: sizes[k][1], reverse=True):
+            w, h = sizes[node_id]
+            if x and x + w > sheet_width:
+                x, y, shelf_height = 0, y + shelf_height + padding, 0
+            offsets[node_id] = {"x": x, "y": y, "width": w, "height": h}
+            x += w + padding
+            shelf_height = max(shelf_height, h)
+
+        sheet = Image.new(self.image.mode, (sheet_width, y + shelf_height))
+        for node_id, o in offsets.items():
+            sheet.paste(self.image.crop(boxes[node_id]), (o["x"], o["y"]))
+        return sheet, offsets, missing
+
+
+class SnapshotCache:
+    """
+    Fingerprints of the last screenshot and hierarchy captured from one device,
+    used to answer `If-None-Match` and to skip re-encoding or re-dumping
+    when the screen has not changed. The last few screenshots are kept,
+    keyed by snapshot id, to cut node crops from.
+    """
+
+    max_snapshots = 2
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshots: "OrderedDict[str, Snapshot]" = OrderedDict()
+        self.snapshot_id: Optional[str] = None
+        # base64 PNG of `snapshot_id`, only encoded once a response body needs it
+        self._screenshot_base64: Optional[str] = None
+        self.hierarchy: Optional[BaseHierarchy] = None
+        self.hierarchy_etag: Optional[str] = None
+        self.hierarchy_body: Optional[bytes] = None
+        # id and (lazily computed) perceptual hash of the screenshot the last hierarchy
+        # was dumped for; the snapshot itself is not held, so it can be evicted
+        self.hierarchy_snapshot_id: Optional[str] = None
+        self.hierarchy_phash: Optional[int] = None
+
+    @property
+    def screenshot_etag(self) -> Optional[str]:
+        return f'"s-{self.snapshot_id}"' if self.snapshot_id else None
+
+    def update_screenshot(self, screenshot: RawScreenshot) -> str:
+        """
+        Records a new screenshot. Only its fingerprint is computed here, the
+        base64 encoding is left to `screenshot_base64`.
+
+        Returns:
+        str: The snapshot id of the screenshot.
+        """
+        snapshot_id = screenshot.fingerprint()
+        if snapshot_id == self.snapshot_id:
+            return snapshot_id
+        self.snapshot_id = snapshot_id
+        self._screenshot_base64 = None
+        if snapshot_id in self.snapshots:
+            self.snapshots.move_to_end(snapshot_id)
+        else:
+            self.snapshots[snapshot_id] = Snapshot(snapshot_id, screenshot)
+        while len(self.snapshots) > self.max_snapshots:
+            _, evicted = self.snapshots.popitem(last=False)
+            if evicted.snapshot_id == self.hierarchy_snapshot_id and self.hierarchy_phash is None:
+                # keep the hash if it is already known, never decode an evicted screenshot
+                self.hierarchy_phash = evicted._phash
+        return snapshot_id
+
+    def screenshot_base64(self) -> Optional[str]:
+        """
+        Gets the base64 PNG of the last screenshot, encoding it once per snapshot id.
+        """
+        if self._screenshot_base64 is None and self.snapshot_id in self.snapshots:
+            self._screenshot_base64 = self.snapshots[self.snapshot_id].screenshot.to_base64()
+        return self._screenshot_base64
+
+    def get_snapshot(self, snapshot_id: str) -> Optional[Snapshot]:
+        return self.snapshots.get(snapshot_id)
+
+    def _hierarchy_phash(self) -> Optional[int]:
+        if self.hierarchy_phash is None and self.hierarchy_snapshot_id in self.snapshots:
+            self.hierarchy_phash = self.snapshots[self.hierarchy_snapshot_id].phash
+        return self.hierarchy_phash
+
+    def hierarchy_reusable(self, snapshot_id: Optional[str], max_distance: Optional[int] = None) -> bool:
+        """
+        Whether the last hierarchy can be served for the screenshot `snapshot_id`
+        instead of dumping a new one: it was dumped for exactly the same screenshot,
+        or, only when `max_distance` is given, for one whose perceptual hash differs
+        by at most `max_distance` bits. The perceptual comparison is lossy: a 9x8
+        difference hash usually stays the same when a text changes or a checkbox
+        toggles, so it can serve a stale hierarchy. It also needs the perceptual hash
+        of the last hierarchy's screenshot, which is lost if that screenshot was
+        evicted before the hash was ever computed.
+        """
+        if self.hierarchy_body is None or self.hierarchy_snapshot_id is None or snapshot_id is None:
+            return False
+        if snapshot_id == self.hierarchy_snapshot_id:
+            return True
+        snapshot = self.snapshots.get(snapshot_id)
+        if max_distance is None or snapshot is None:
+            return False
+        phash = self._hierarchy_phash()
+        if phash is None:
+            return False
+        return hamming_distance(phash, snapshot.phash) <= max_distance
+
+    def reuse_hierarchy(self, snapshot_id: str) -> Tuple[str, bytes]:
+        """
+        Serves the last hierarchy again, for the screenshot `snapshot_id`.
+
+        Returns:
+        Tuple[str, bytes]: The ETag and the serialized hierarchy response.
+        """
+        snapshot = self.snapshots.get(snapshot_id)
+        if snapshot is not None:
+            snapshot.attach(self.hierarchy)
+        return self.hierarchy_etag, self.hierarchy_body
+
+    def update_hierarchy(self, hierarchy: BaseHierarchy, body: bytes, snapshot_id: Optional[str]) -> str:
+        """
+        Records a new hierarchy and its serialized response, dumped for the
+        screenshot `snapshot_id`. Without a (still cached) snapshot id the hierarchy
+        is not paired with any screenshot, so it can neither be reused nor cropped.
+        Only the tree of the hierarchy is kept, its `jsonHierarchy` lives on in `body`.
+
+        Returns:
+        str: The ETag of the hierarchy.
+        """
+        hierarchy = hierarchy.compact()
+        self.hierarchy = hierarchy
+        self.hierarchy_etag = f'"h-{fast_hash(body)}"'
+        self.hierarchy_body = body
+        snapshot = self.snapshots.get(snapshot_id) if snapshot_id else None
+        self.hierarchy_snapshot_id = snapshot_id if snapshot is not None else None
+        self.hierarchy_phash = None
+        if snapshot is not None:
+            snapshot.attach(hierarchy)
+        return self.hierarchy_etag
+
+
+# Global cache for snapshot fingerprints, keyed like `cached_devices`
+cached_snapshots: Dict[Tuple[str, str], SnapshotCache] = {}
+
+
+def get_snapshot_cache(platform: str, serial: str) -> SnapshotCache:
+    return cached_snapshots.setdefault((platform, serial), SnapshotCache())
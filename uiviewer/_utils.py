@@ -2,26 +2,38 @@
 
 import base64
 import json
-from typing import Dict
-from PIL import Image
+from typing import Dict, TYPE_CHECKING
 from io import BytesIO
 
 from uiviewer._logger import logger
 
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+def bytes2base64(data: bytes) -> str:
+    return base64.b64encode(data).decode('utf-8')
+
 
 def file2base64(path: str) -> str:
     with open(path, "rb") as file:
-        base64_encoded = base64.b64encode(file.read())
-        return base64_encoded.decode('utf-8')
+        return bytes2base64(file.read())
 
 
-def image2base64(image: Image.Image, format: str = "PNG") -> str:
+def image2bytes(image: "Image.Image", format: str = "PNG") -> bytes:
     """
-    PIL Image to base64 string
+    PIL Image to encoded image bytes
     """
     buffered = BytesIO()
     image.save(buffered, format=format)
-    return base64.b64encode(buffered.getvalue()).decode('utf-8')
+    return buffered.getvalue()
+
+
+def image2base64(image: "Image.Image", format: str = "PNG") -> str:
+    """
+    PIL Image to base64 string
+    """
+    return base64.b64encode(image2bytes(image, format)).decode('utf-8')
 
 
 def str2json(s: str) -> Dict:
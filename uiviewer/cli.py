@@ -1,15 +1,58 @@
 # -*- coding: utf-8 -*-
 
+import sys
 import argparse
-from uiviewer.__main__ import run
+
+from uiviewer._models import Platform
+
+
+def capture(args):
+    from uiviewer._capture import Capturer, parse_wda_urls, format_report
+
+    capturer = Capturer(
+        platforms=args.platform or [p.value for p in Platform],
+        output=args.output,
+        jobs=args.jobs,
+        wda_urls=parse_wda_urls(args.wda_url),
+        max_depth=args.max_depth,
+        with_xpath=not args.no_xpath
+    )
+    stats = capturer.run(rounds=args.rounds, interval=args.interval)
+    print(format_report(stats), file=sys.stderr)
+    if not stats or any(s.failures for s in stats.values()):
+        sys.exit(1)
 
 
 def main():
     parser = argparse.ArgumentParser(description="My CLI Tool")
     parser.add_argument('-p', '--port', type=int, default=8000, help='local listen port for uiviewer')
+    parser.add_argument('--host', default="127.0.0.1", help='listen host for uiviewer, e.g. 0.0.0.0 on lab hosts')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='worker processes; devices are assigned to workers by serial (uses port+1..port+N)')
+    parser.add_argument('--no-browser', action='store_true', help='do not open the browser on startup')
+
+    subparsers = parser.add_subparsers(dest='command')
+    capture_parser = subparsers.add_parser('capture', help='capture screenshot and hierarchy of all devices without the web UI')
+    capture_parser.add_argument('--platform', action='append', choices=[p.value for p in Platform],
+                                help='platform to capture, repeatable (default: all)')
+    capture_parser.add_argument('-o', '--output', default='-',
+                                help='NDJSON output file, appended to; gzip compressed if it ends with .gz (default: stdout)')
+    capture_parser.add_argument('-j', '--jobs', type=int, default=4, help='devices captured concurrently')
+    capture_parser.add_argument('--rounds', type=int, default=1, help='capture rounds, 0 means until interrupted')
+    capture_parser.add_argument('--interval', type=float, default=0, help='seconds between the starts of two rounds')
+    capture_parser.add_argument('--wda-url', action='append',
+                                help='iOS WDA url, as UDID=URL for one device or URL for all, repeatable')
+    capture_parser.add_argument('--max-depth', type=int, default=None, help='iOS snapshotMaxDepth (default 30)')
+    capture_parser.add_argument('--no-xpath', action='store_true', help='do not compute xpathLite of every node')
+
     args = parser.parse_args()
-    run(port=args.port)
+    if args.command == 'capture':
+        capture(args)
+        return
+
+    from uiviewer.__main__ import run
+    run(port=args.port, host=args.host, workers=args.workers, browser=not args.no_browser)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
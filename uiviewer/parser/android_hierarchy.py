@@ -1,10 +1,10 @@
 # -*- coding: utf-8 -*-
 
-import xml.dom.minidom
-import uuid
-from typing import Dict
+import xml.etree.ElementTree as ET
+from typing import Dict, Tuple, Optional
 
-from uiviewer.parser.utils import parse_bounds, safe_xmlstr, str2bool, str2int, convstr
+from uiviewer.parser.tree import NodeTree, NO_NODE
+from uiviewer.parser.utils import parse_bounds_rect, safe_xmlstr, str2bool, str2int, convstr
 
 __alias = {
     'class': '_type',
@@ -17,7 +17,7 @@ __alias = {
 __parsers = {
     '_type': safe_xmlstr,  # node className
     # Android
-    'rect': parse_bounds,
+    'rect': parse_bounds_rect,
     'text': convstr,
     'resourceId': convstr,
     'package': convstr,
@@ -42,52 +42,45 @@ __parsers = {
     'enabled': str2bool,
 }
 
+# `package` is the same for every node of a dump, so it is not kept per node
+__skipped = frozenset(('package', '_type', 'rect'))
 
-def _parse_node_attributes(node):
-    attributes = {}
-    for key, value in node.attributes.items():
-        key = __alias.get(key, key)
-        parser = __parsers.get(key)
-        if value is None:
-            attributes[key] = None
-        elif parser:
-            attributes[key] = parser(value)
-    return attributes
+HEAD_KEYS = ('xpath', '_type', 'resourceId', 'text', 'description')
 
 
-def _parse_uiautomator_node(node):
-    attributes = _parse_node_attributes(node)
-    if 'bounds' in attributes:
-        lx, ly, rx, ry = map(int, attributes.pop('bounds'))
-        attributes['rect'] = dict(x=lx, y=ly, width=rx - lx, height=ry - ly)
-    return attributes
-
+def _parse_node_attributes(node: ET.Element) -> Tuple[Optional[str], Tuple, Tuple, Optional[Tuple]]:
+    node_type = None
+    rect = None
+    keys = ['xpath']
+    values = ['']
+    for key, value in node.attrib.items():
+        key = __alias.get(key, key)
+        parser = __parsers.get(key)
+        if parser is None:
+            continue
+        if key == '_type':
+            node_type = parser(value)
+        elif key == 'rect':
+            rect = parser(value)
+        elif key not in __skipped:
+            keys.append(key)
+            values.append(parser(value))
+    return node_type, tuple(keys), tuple(values), rect
 
-def convert_android_hierarchy(page_xml: str) -> Dict:
-    dom = xml.dom.minidom.parseString(page_xml)
-    root = dom.documentElement
 
-    def __travel(node, parent_id=""):
-        if node.attributes is None:
-            return
-        json_node = _parse_uiautomator_node(node)
-        json_node['_id'] = str(uuid.uuid4())
-        json_node['_parentId'] = parent_id
-        json_node['xpath'] = ""
-        json_node.pop("package", None)
-        if node.childNodes:
-            children = []
-            for n in node.childNodes:
-                child = __travel(n, json_node['_id'])
-                if child:
-                    children.append(child)
-            json_node['children'] = children
+def build_android_tree(page_xml: str) -> NodeTree:
+    tree = NodeTree(HEAD_KEYS)
+    root = ET.fromstring(page_xml)
 
-        # Sort the keys
-        keys_order = ['xpath', '_type', 'resourceId', 'text', 'description']
-        sorted_node = {k: json_node[k] for k in keys_order if k in json_node}
-        sorted_node.update({k: json_node[k] for k in json_node if k not in keys_order})
+    stack = [(root, NO_NODE)]
+    while stack:
+        node, parent_index = stack.pop()
+        node_type, keys, values, rect = _parse_node_attributes(node)
+        index = tree.add(parent_index, node_type, keys, values, rect)
+        for child in reversed(node):
+            stack.append((child, index))
+    return tree
 
-        return sorted_node
 
-    return __travel(root)
\ No newline at end of file
+def convert_android_hierarchy(page_xml: str) -> Dict:
+    return build_android_tree(page_xml).to_dict()
@@ -1,66 +1,73 @@
 # -*- coding: utf-8 -*-
 
-import uuid
 from typing import Dict
 
+from uiviewer._logger import logger
+from uiviewer.parser.tree import NodeTree, NO_NODE
+from uiviewer.parser.utils import parse_bounds_rect
+
+HEAD_KEYS = ('index', 'text', 'id', '_type', 'description')
+
+_ATTR_KEYS = (
+    "index",
+    "text",
+    "id",
+    "description",
+    "checkable",
+    "clickable",
+    "enabled",
+    "focusable",
+    "focused",
+    "scrollable",
+    "longClickable",
+    "password",
+    "selected",
+    "xpath",
+)
+
+_EMPTY_RECT = (0, 0, 0, 0)
 
-def convert_harmony_hierarchy(data: Dict) -> Dict:
-    ret = {"_id": str(uuid.uuid4()), "children": [], "_parentId": ""}
 
-    def __travel(node_a, parent_id=""):
-        node_b = {
-            "index": 0,
-            "text": "",
-            "id": "",
-            "_type": "",
-            "description": "",
-            "checkable": False,
-            "clickable": False,
-            "enabled": False,
-            "focusable": False,
-            "focused": False,
-            "scrollable": False,
-            "longClickable": False,
-            "password": False,
-            "selected": False,
-            "rect": {
-                "x": 0,
-                "y": 0,
-                "width": 0,
-                "height": 0
-            },
-            "_id": str(uuid.uuid4()),
-            "_parentId": parent_id,
-            "xpath": ""
-        }
+def _is_true(attributes: Dict, key: str) -> bool:
+    return attributes.get(key, "").lower() == "true"
 
+
+def build_harmony_tree(data: Dict) -> NodeTree:
+    tree = NodeTree(HEAD_KEYS)
+    root = tree.add(NO_NODE, None)
+
+    stack = [(child, root) for child in reversed(data.get("children", []))]
+    while stack:
+        node_a, parent_index = stack.pop()
         attributes = node_a.get("attributes", {})
-        node_b["xpath"] = attributes.get("xpath", "")
-        node_b["_type"] = attributes.get("type", "")
-        node_b["id"] = attributes.get("id", "")
-        node_b["description"] = attributes.get("description", "")
-        node_b["text"] = attributes.get("text", "")
-        node_b["checkable"] = attributes.get("checkable", "").lower() == "true"
-        node_b["clickable"] = attributes.get("clickable", "").lower() == "true"
-        node_b["enabled"] = attributes.get("enabled", "").lower() == "true"
-        node_b["focusable"] = attributes.get("focusable", "").lower() == "true"
-        node_b["focused"] = attributes.get("focused", "").lower() == "true"
-        node_b["scrollable"] = attributes.get("scrollable", "").lower() == "true"
-        node_b["longClickable"] = attributes.get("longClickable", "").lower() == "true"
+        values = (
+            0,
+            attributes.get("text", ""),
+            attributes.get("id", ""),
+            attributes.get("description", ""),
+            _is_true(attributes, "checkable"),
+            _is_true(attributes, "clickable"),
+            _is_true(attributes, "enabled"),
+            _is_true(attributes, "focusable"),
+            _is_true(attributes, "focused"),
+            _is_true(attributes, "scrollable"),
+            _is_true(attributes, "longClickable"),
+            False,
+            False,
+            attributes.get("xpath", ""),
+        )
         bounds = attributes.get("bounds", "")
-        bounds = bounds.strip("[]").split("][")
-        node_b["rect"]["x"] = int(bounds[0].split(",")[0])
-        node_b["rect"]["y"] = int(bounds[0].split(",")[1])
-        node_b["rect"]["width"] = int(bounds[1].split(",")[0]) - int(bounds[0].split(",")[0])
-        node_b["rect"]["height"] = int(bounds[1].split(",")[1]) - int(bounds[0].split(",")[1])
+        rect = parse_bounds_rect(bounds)
+        if rect is None:
+            if bounds:
+                logger.warning(f"Invalid bounds<{bounds}> of {attributes.get('type', '')} node")
+            rect = _EMPTY_RECT
+        index = tree.add(parent_index, attributes.get("type", ""), _ATTR_KEYS, values, rect)
 
-        children = node_a.get("children", [])
-        if children:
-            node_b["children"] = [__travel(child, node_b["_id"]) for child in children]
+        for child in reversed(node_a.get("children", [])):
+            stack.append((child, index))
+    return tree
 
-        return node_b
 
-    # Recursively convert children of a to match b's structure
-    ret["children"] = [__travel(child, ret["_id"]) for child in data.get("children", [])]
-
-    return ret
\ No newline at end of file
+def convert_harmony_hierarchy(data: Dict) -> Dict:
+    return build_harmony_tree(data).to_dict()
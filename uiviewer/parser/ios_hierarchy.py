@@ -1,30 +1,42 @@
 # -*- coding: utf-8 -*-
 
-import uuid
 from typing import Dict
 
+from uiviewer.parser.tree import NodeTree, NO_NODE
+
+HEAD_KEYS = ('xpath', '_type', 'label', 'name', 'id', 'value')
+
+# Keys consumed by the tree columns or renamed below
+_SKIPPED_KEYS = frozenset(('type', 'rawIdentifier', 'rect', 'children'))
 
-def convert_ios_hierarchy(data: Dict, scale: int) -> Dict:
 
-    def __travel(node, parent_id=""):
-        node['_id'] = str(uuid.uuid4())
-        node['_parentId'] = parent_id
-        node['_type'] = node.pop('type', "null")
-        node['id'] = node.pop('rawIdentifier', "null")
-        node['xpath'] = ""
-        if 'rect' in node:
-            rect = node['rect']
-            node['rect'] = {k: v * scale for k, v in rect.items()}
+def build_ios_tree(data: Dict, scale: int) -> NodeTree:
+    tree = NodeTree(HEAD_KEYS)
 
-        # Recursively process children nodes
-        if 'children' in node:
-            node['children'] = [__travel(child, node['_id']) for child in node['children']]
+    stack = [(data, NO_NODE)]
+    while stack:
+        node, parent_index = stack.pop()
+        keys = ['xpath', 'id']
+        values = ['', node.get('rawIdentifier', "null")]
+        for k, v in node.items():
+            if k not in _SKIPPED_KEYS:
+                keys.append(k)
+                values.append(v)
 
-        # Sort the keys
-        keys_order = ['xpath', '_type', 'label', 'name', 'id', 'value']
-        sorted_node = {k: node[k] for k in keys_order if k in node}
-        sorted_node.update({k: node[k] for k in node if k not in keys_order})
+        rect = node.get('rect')
+        if rect is not None:
+            rect = (
+                rect.get('x', 0) * scale,
+                rect.get('y', 0) * scale,
+                rect.get('width', 0) * scale,
+                rect.get('height', 0) * scale,
+            )
+        index = tree.add(parent_index, node.get('type', "null"), tuple(keys), tuple(values), rect)
 
-        return sorted_node
+        for child in reversed(node.get('children') or []):
+            stack.append((child, index))
+    return tree
 
-    return __travel(data)
+
+def convert_ios_hierarchy(data: Dict, scale: int) -> Dict:
+    return build_ios_tree(data, scale).to_dict()
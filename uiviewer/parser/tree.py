@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+import sys
+from array import array
+from typing import Dict, List, Tuple, Optional, Iterator, Sequence, Union, Any
+
+
+Rect = Tuple[Union[int, float], ...]
+
+NO_NODE = -1
+
+# Keys that are stored in dedicated columns rather than in the attribute table
+_RESERVED_KEYS = frozenset(("_id", "_parentId", "_type", "rect", "children"))
+
+
+class NodeTree:
+    """
+    Array-backed UI hierarchy shared by the Android, iOS and HarmonyOS parsers.
+
+    Nodes are plain integer indices. Structure is stored as parent / first-child /
+    next-sibling links, bounds as packed (x, y, width, height) double quadruples
+    (whole values are returned as int), node types as interned strings, and
+    attributes as value tuples whose keys live in a per-tree table of shared
+    schemas (every node with the same attribute layout points at the same key tuple).
+    """
+
+    __slots__ = (
+        "head_keys",
+        "_types",
+        "_parent",
+        "_first_child",
+        "_last_child",
+        "_next_sibling",
+        "_rects",
+        "_has_rect",
+        "_schema",
+        "_values",
+        "_schemas",
+        "_schema_ids",
+        "_schema_pos",
+        "_ids",
+        "_id_index",
+    )
+
+    def __init__(self, head_keys: Sequence[str] = ()):
+        """
+        Args:
+        head_keys (Sequence[str]): Keys emitted first, in this order, by `to_dict`.
+            `_type` may be listed here as well.
+        """
+        self.head_keys: Tuple[str, ...] = tuple(head_keys)
+        self._types: List[Optional[str]] = []
+        self._parent = array("i")
+        self._first_child = array("i")
+        self._last_child = array("i")
+        self._next_sibling = array("i")
+        self._rects = array("d")
+        self._has_rect = bytearray()
+        self._schema = array("H")
+        self._values: List[Tuple] = []
+        self._schemas: List[Tuple[str, ...]] = []
+        self._schema_ids: Dict[Tuple[str, ...], int] = {}
+        self._schema_pos: List[Dict[str, int]] = []
+        # Only set when the tree was rebuilt from a dict that carries foreign ids
+        self._ids: Optional[List[str]] = None
+        self._id_index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def _intern_schema(self, keys: Tuple[str, ...]) -> int:
+        schema_id = self._schema_ids.get(keys)
+        if schema_id is None:
+            keys = tuple(sys.intern(k) for k in keys)
+            schema_id = len(self._schemas)
+            self._schemas.append(keys)
+            self._schema_ids[keys] = schema_id
+            self._schema_pos.append({k: i for i, k in enumerate(keys)})
+        return schema_id
+
+    def add(
+        self,
+        parent: int,
+        node_type: Optional[str],
+        keys: Tuple[str, ...] = (),
+        values: Tuple = (),
+        rect: Optional[Rect] = None
+    ) -> int:
+        """
+        Appends a node as the last child of `parent` (or as the root when `parent` is NO_NODE).
+
+        Args:
+        parent (int): Parent node index, or NO_NODE.
+        node_type (Optional[str]): The node class / type name.
+        keys (Tuple[str, ...]): Attribute names, in display order.
+        values (Tuple): Attribute values, aligned with `keys`.
+        rect (Optional[Rect]): Node bounds as (x, y, width, height).
+
+        Returns:
+        int: The new node index.
+        """
+        index = len(self._types)
+        self._types.append(sys.intern(node_type) if node_type is not None else None)
+        self._parent.append(parent)
+        self._first_child.append(NO_NODE)
+        self._last_child.append(NO_NODE)
+        self._next_sibling.append(NO_NODE)
+        if rect is None:
+            self._rects.extend((0, 0, 0, 0))
+            self._has_rect.append(0)
+        else:
+            self._rects.extend(rect)
+            self._has_rect.append(1)
+        self._schema.append(self._intern_schema(keys))
+        self._values.append(values)
+
+        if parent != NO_NODE:
+            last = self._last_child[parent]
+            if last == NO_NODE:
+                self._first_child[parent] = index
+            else:
+                self._next_sibling[last] = index
+            self._last_child[parent] = index
+        return index
+
+    def parent(self, index: int) -> int:
+        return self._parent[index]
+
+    def children(self, index: int) -> Iterator[int]:
+        child = self._first_child[index]
+        while child != NO_NODE:
+            yield child
+            child = self._next_sibling[child]
+
+    def has_children(self, index: int) -> bool:
+        return self._first_child[index] != NO_NODE
+
+    def node_type(self, index: int) -> Optional[str]:
+        return self._types[index]
+
+    def rect(self, index: int) -> Optional[Rect]:
+        if not self._has_rect[index]:
+            return None
+        offset = index * 4
+        return tuple(int(v) if v.is_integer() else v for v in self._rects[offset:offset + 4])
+
+    def get(self, index: int, key: str, default: Any = None) -> Any:
+        if key == "_type":
+            return self._types[index]
+        pos = self._schema_pos[self._schema[index]].get(key)
+        if pos is None:
+            return default
+        return self._values[index][pos]
+
+    def attributes(self, index: int) -> Iterator[Tuple[str, Any]]:
+        return zip(self._schemas[self._schema[index]], self._values[index])
+
+    def node_id(self, index: int) -> str:
+        if self._ids is not None:
+            return self._ids[index]
+        return str(index)
+
+    def index_of(self, node_id: str) -> Optional[int]:
+        """
+        Resolves a node `_id` back to its index, or None if it is not in the tree.
+        """
+        if self._ids is not None:
+            if self._id_index is None:
+                self._id_index = {v: i for i, v in enumerate(self._ids)}
+            return self._id_index.get(node_id)
+        try:
+            index = int(node_id)
+        except (TypeError, ValueError):
+            return None
+        return index if 0 <= index < len(self._types) else None
+
+    def walk(self, index: int = 0) -> Iterator[int]:
+        """
+        Pre-order traversal of the subtree rooted at `index`.
+        """
+        if not self._types:
+            return
+        stack = [index]
+        while stack:
+            node = stack.pop()
+            yield node
+            child = self._first_child[node]
+            if child != NO_NODE:
+                siblings = []
+                while child != NO_NODE:
+                    siblings.append(child)
+                    child = self._next_sibling[child]
+                stack.extend(reversed(siblings))
+
+    def _node_dict(self, index: int) -> Dict:
+        attrs = dict(self.attributes(index))
+        node_type = self._types[index]
+        node = {}
+        for key in self.head_keys:
+            if key == "_type":
+                if node_type is not None:
+                    node["_type"] = node_type
+            elif key in attrs:
+                node[key] = attrs.pop(key)
+        if node_type is not None and "_type" not in node:
+            node["_type"] = node_type
+        node.update(attrs)
+        if self._has_rect[index]:
+            x, y, width, height = self.rect(index)
+            node["rect"] = {"x": x, "y": y, "width": width, "height": height}
+        node["_id"] = self.node_id(index)
+        parent = self._parent[index]
+        node["_parentId"] = self.node_id(parent) if parent != NO_NODE else ""
+        return node
+
+    def to_dict(self, index: int = 0) -> Dict:
+        """
+        Serializes the subtree rooted at `index` into the nested JSON layout the web UI consumes.
+        """
+        if not self._types:
+            return {}
+        root = self._node_dict(index)
+        stack = [(index, root)]
+        while stack:
+            node, node_dict = stack.pop()
+            if self._first_child[node] == NO_NODE:
+                continue
+            children = []
+            for child in self.children(node):
+                child_dict = self._node_dict(child)
+                children.append(child_dict)
+                stack.append((child, child_dict))
+            node_dict["children"] = children
+        return root
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "NodeTree":
+        """
+        Rebuilds a tree from its nested JSON layout, keeping the original `_id`s.
+        """
+        tree = cls()
+        ids: List[str] = []
+        if not data:
+            tree._ids = ids
+            return tree
+        stack = [(data, NO_NODE)]
+        while stack:
+            node, parent = stack.pop()
+            keys = tuple(k for k in node if k not in _RESERVED_KEYS)
+            rect = node.get("rect")
+            if rect:
+                rect = (rect["x"], rect["y"], rect["width"], rect["height"])
+            index = tree.add(parent, node.get("_type"), keys, tuple(node[k] for k in keys), rect or None)
+            ids.append(node.get("_id", str(index)))
+            # push in reverse so children are added in document order
+            for child in reversed(node.get("children") or []):
+                stack.append((child, index))
+        tree._ids = ids
+        return tree
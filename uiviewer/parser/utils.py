@@ -2,9 +2,11 @@
 
 import re
 
+_BOUNDS_RE = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+
 
 def parse_bounds(text):
-    m = re.match(r'\[(\d+),(\d+)\]\[(\d+),(\d+)\]', text)
+    m = _BOUNDS_RE.match(text)
     if m is None:
         return None
     (lx, ly, rx, ry) = map(int, m.groups())
@@ -24,4 +26,15 @@ def str2int(v):
 
 
 def convstr(v):
-    return v
\ No newline at end of file
+    return v
+
+
+def parse_bounds_rect(text):
+    """
+    Like `parse_bounds`, but returns a packed (x, y, width, height) tuple.
+    """
+    m = _BOUNDS_RE.match(text)
+    if m is None:
+        return None
+    (lx, ly, rx, ry) = map(int, m.groups())
+    return (lx, ly, rx - lx, ry - ly)
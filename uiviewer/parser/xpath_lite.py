@@ -1,136 +1,115 @@
 # -*- coding: utf-8 -*-
 
-from typing import Dict
+from typing import Dict, Union
+
+from uiviewer.parser.tree import NodeTree, NO_NODE
 
 
 class XPathLiteGenerator:
-    def __init__(self, platform: str, treedata: Dict):
+    def __init__(self, platform: str, treedata: Union[Dict, NodeTree]):
         """
         Initializes the XPathLiteGenerator class.
 
         Args:
         platform (str): The platform type (e.g., 'ios', 'android').
-        treedata (Dict): The JSON tree structure data.
+        treedata (Union[Dict, NodeTree]): The JSON tree structure data, or an already built NodeTree.
 
         Returns:
         None
         """
         self.platform = platform
-        self.treedata = treedata
-        self.node_map = self._build_node_map(treedata)
+        self.tree = treedata if isinstance(treedata, NodeTree) else NodeTree.from_dict(treedata)
 
-    def _build_node_map(self, node: Dict, node_map: Dict[str, Dict] = None) -> Dict[str, Dict]:
+    def _get_value(self, node: int) -> str:
         """
-        Builds a node map for quick lookup by node _id.
+        Gets the specific attribute value of a node to generate part of the XPath expression.
 
         Args:
-        node (Dict): The current node.
-        node_map (Dict[str, Dict], optional): The node map. Default is an empty dictionary.
+        node (int): The current node index.
 
         Returns:
-        Dict[str, Dict]: The node map.
-        """
-        if node_map is None:
-            node_map = {}
-        node_map[node["_id"]] = node
-        if "children" in node:
-            for child in node["children"]:
-                self._build_node_map(child, node_map)
-        return node_map
-
-    def _find_node_by_id(self, target_id: str) -> Dict:
-        """
-        Finds a node by its ID.
-
-        Args:
-        target_id (str): The target node ID.
-
-        Returns:
-        Dict: The target node.
+        str: Part of the XPath expression.
         """
-        return self.node_map.get(target_id)
+        get = self.tree.get
+        if get(node, "resourceId"):
+            return f'//*[@resource-id="{get(node, "resourceId")}"]'
+        elif get(node, "text"):
+            return f'//*[@text="{get(node, "text")}"]'
+        elif get(node, "description"):
+            return f'//*[@content-desc="{get(node, "description")}"]'
+        elif get(node, "label"):
+            return f'//*[@label="{get(node, "label")}"]'
+        elif get(node, "name"):
+            return f'//*[@name="{get(node, "name")}"]'
+        elif get(node, "id"):   # harmonyos, ios
+            return f'//*[@id="{get(node, "id")}"]'
+        return None
 
-    def _get_value(self, node: Dict) -> str:
+    def _sibling_index(self, parent: int, node: int) -> int:
         """
-        Gets the specific attribute value of a node to generate part of the XPath expression.
+        Gets the 1-based position of a node among its parent's children of the same type.
 
         Args:
-        node (Dict): The current node.
+        parent (int): The parent node index.
+        node (int): The current node index.
 
         Returns:
-        str: Part of the XPath expression.
+        int: The position used in the XPath predicate.
         """
-        if node.get("resourceId"):
-            return f'//*[@resource-id="{node["resourceId"]}"]'
-        elif node.get("text"):
-            return f'//*[@text="{node["text"]}"]'
-        elif node.get("description"):
-            return f'//*[@content-desc="{node["description"]}"]'
-        elif node.get("label"):
-            return f'//*[@label="{node["label"]}"]'
-        elif node.get("name"):
-            return f'//*[@name="{node["name"]}"]'
-        elif node.get("id"):   # harmonyos, ios
-            return f'//*[@id="{node["id"]}"]'
-        return None
-
-    def _build_xpath(self, node: Dict, path: str, found_value: bool = False) -> str:
+        node_type = self.tree.node_type(node)
+        index = 1
+        for sibling in self.tree.children(parent):
+            if sibling == node:
+                break
+            if self.tree.node_type(sibling) == node_type:
+                index += 1
+        return index
+
+    def _build_xpath(self, node: int, path: str, found_value: bool = False) -> str:
         """
         Recursively builds the XPath expression.
 
         Args:
-        node (Dict): The current node.
+        node (int): The current node index.
         path (str): The current path.
         found_value (bool, optional): Whether a specific attribute value has been found. Default is False.
 
         Returns:
         str: The complete XPath expression.
         """
-        if not node:
+        if node == NO_NODE:
             return path
         value = self._get_value(node)
         if value:
             found_value = True
             return value + path
-        if self.platform == 'ios' and not (node.get("lable") or node.get("name")):
+        if self.platform == 'ios' and not (self.tree.get(node, "lable") or self.tree.get(node, "name")):
             # If the platform is iOS and the node does not have lable, name, build from root
             return self._build_from_root(node, path)
 
-        parent_node = self._find_node_by_id(node["_parentId"])
-        if parent_node:
-            siblings = parent_node.get("children", [])
-            index = 1
-            for sibling in siblings:
-                if sibling["_type"] == node["_type"]:
-                    if sibling["_id"] == node["_id"]:
-                        break
-                    index += 1
-            path = f'/{node["_type"]}[{index}]' + path
+        parent_node = self.tree.parent(node)
+        if parent_node != NO_NODE:
+            index = self._sibling_index(parent_node, node)
+            path = f'/{self.tree.node_type(node)}[{index}]' + path
             return self._build_xpath(parent_node, path, found_value)
         return path
 
-    def _build_from_root(self, node: Dict, path: str) -> str:
+    def _build_from_root(self, node: int, path: str) -> str:
         """
         Builds the XPath expression from the root node.
 
         Args:
-        node (Dict): The current node.
+        node (int): The current node index.
         path (str): The current path.
 
         Returns:
         str: The complete XPath expression.
         """
-        if "_type" in node:
-            parent_node = self._find_node_by_id(node["_parentId"])
-            if parent_node:
-                siblings = parent_node.get("children", [])
-                index = 1
-                for sibling in siblings:
-                    if sibling["_type"] == node["_type"]:
-                        if sibling["_id"] == node["_id"]:
-                            break
-                        index += 1
-                path = f'/{node["_type"]}[{index}]' + path
+        if self.tree.node_type(node) is not None:
+            parent_node = self.tree.parent(node)
+            if parent_node != NO_NODE:
+                index = self._sibling_index(parent_node, node)
+                path = f'/{self.tree.node_type(node)}[{index}]' + path
                 return self._build_from_root(parent_node, path)
         return '//' + path.lstrip('/')
 
@@ -144,8 +123,8 @@ class XPathLiteGenerator:
         Returns:
         str: The XPathLite path.
         """
-        target_node = self._find_node_by_id(target_id)
-        if not target_node:
+        target_node = self.tree.index_of(target_id)
+        if target_node is None:
             return None
 
         xpath_lite = self._build_xpath(target_node, "")
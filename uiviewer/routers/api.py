@@ -1,20 +1,21 @@
 # -*- coding: utf-8 -*-
 
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, Optional
 
-from fastapi import APIRouter, Query
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, Query, Header, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import RedirectResponse, JSONResponse, Response
 
 from uiviewer._device import (
     list_serials,
     init_device,
     cached_devices,
-    AndroidDevice,
-    IosDevice,
-    HarmonyDevice
+    DeviceMeta
 )
 from uiviewer._version import __version__
-from uiviewer._models import ApiResponse, XPathLiteRequest
+from uiviewer._snapshot import Snapshot, get_snapshot_cache
+from uiviewer._utils import image2base64, image2bytes
+from uiviewer._models import ApiResponse, XPathLiteRequest, SpriteRequest
 from uiviewer.parser.xpath_lite import XPathLiteGenerator
 
 
@@ -53,18 +54,98 @@ def connect(
     return ApiResponse.doSuccess(ret)
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
 @router.get("/{platform}/{serial}/screenshot", response_model=ApiResponse)
-def screenshot(platform: str, serial: str):
-    device: Union[AndroidDevice, IosDevice, HarmonyDevice] = cached_devices.get((platform, serial))
-    data = device.take_screenshot()
-    return ApiResponse.doSuccess(data)
+def screenshot(
+    platform: str,
+    serial: str,
+    if_none_match: Union[str, None] = Header(None)
+):
+    device: DeviceMeta = cached_devices.get((platform, serial))
+    cache = get_snapshot_cache(platform, serial)
+    with cache.lock:
+        snapshot_id = cache.update_screenshot(device.capture_screenshot())
+        etag = cache.screenshot_etag
+        headers = {"ETag": etag, "X-Snapshot-Id": snapshot_id}
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        data = cache.screenshot_base64()
+    return JSONResponse(jsonable_encoder(ApiResponse.doSuccess(data)), headers=headers)
 
 
 @router.get("/{platform}/{serial}/hierarchy", response_model=ApiResponse)
-def dump_hierarchy(platform: str, serial: str):
-    device: Union[AndroidDevice, IosDevice, HarmonyDevice] = cached_devices.get((platform, serial))
-    data = device.dump_hierarchy()
-    return ApiResponse.doSuccess(data)
+def dump_hierarchy(
+    platform: str,
+    serial: str,
+    snapshotId: Union[str, None] = Query(None),
+    reuse: bool = Query(False),
+    screenDistance: Union[int, None] = Query(None),
+    if_none_match: Union[str, None] = Header(None)
+):
+    """
+    `snapshotId`: the screenshot (`X-Snapshot-Id`) this hierarchy is dumped for;
+    node crops of that snapshot use it.
+    `reuse`: serve the last hierarchy instead of dumping a new one when it was dumped
+    for exactly the same screenshot. Without `snapshotId` a fresh screenshot is taken
+    to compare with.
+    `screenDistance`: lossy, implies `reuse`; also reuse when the perceptual hashes of
+    the two screenshots differ by at most this many bits. A 9x8 difference hash
+    usually does not change when a text changes or a checkbox toggles.
+    """
+    device: DeviceMeta = cached_devices.get((platform, serial))
+    cache = get_snapshot_cache(platform, serial)
+    reuse = reuse or screenDistance is not None
+    with cache.lock:
+        if reuse and snapshotId is None:
+            snapshotId = cache.update_screenshot(device.capture_screenshot())
+        if reuse and cache.hierarchy_reusable(snapshotId, screenDistance):
+            etag, body = cache.reuse_hierarchy(snapshotId)
+        else:
+            data = device.dump_hierarchy()
+            body = JSONResponse(jsonable_encoder(ApiResponse.doSuccess(data))).body
+            etag = cache.update_hierarchy(data, body, snapshotId)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def _get_snapshot(platform: str, serial: str, snapshot_id: str) -> Snapshot:
+    snapshot = get_snapshot_cache(platform, serial).get_snapshot(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot<{snapshot_id}> not found or expired")
+    if snapshot.hierarchy is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot<{snapshot_id}> has no hierarchy")
+    return snapshot
+
+
+@router.get("/{platform}/{serial}/snapshots/{snapshot_id}/crop/{node_id}")
+def crop_node(platform: str, serial: str, snapshot_id: str, node_id: str):
+    snapshot = _get_snapshot(platform, serial, snapshot_id)
+    img = snapshot.crop(node_id)
+    if img is None:
+        raise HTTPException(status_code=404, detail=f"Node<{node_id}> not found or not visible")
+    return Response(content=image2bytes(img), media_type="image/png")
+
+
+@router.post("/{platform}/{serial}/snapshots/{snapshot_id}/sprite", response_model=ApiResponse)
+def crop_sprite(platform: str, serial: str, snapshot_id: str, request: SpriteRequest):
+    snapshot = _get_snapshot(platform, serial, snapshot_id)
+    sheet, offsets, missing = snapshot.sprite(request.node_ids, max(0, request.padding))
+    return ApiResponse.doSuccess({
+        "image": image2base64(sheet) if sheet else None,
+        "offsets": offsets,
+        "missing": missing
+    })
 
 
 @router.post("/{platform}/hierarchy/xpathLite", response_model=ApiResponse)
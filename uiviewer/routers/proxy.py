@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import zlib
+import itertools
+import urllib.request
+import urllib.error
+from typing import List
+
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+
+from uiviewer._logger import logger
+
+
+# Request headers worth forwarding to a worker
+_FORWARD_HEADERS = ("content-type", "accept", "if-none-match")
+# Response headers worth returning to the client
+_RETURN_HEADERS = ("content-type", "etag", "cache-control", "x-snapshot-id")
+
+
+def pick_worker(workers: List[str], serial: str) -> str:
+    """
+    Sticky assignment: a serial always lands on the same worker, so that its
+    cached device connection lives in exactly one process.
+    """
+    return workers[zlib.crc32(serial.encode("utf-8")) % len(workers)]
+
+
+def build_router(workers: List[str], timeout: float = 120) -> APIRouter:
+    """
+    Builds the front router that dispatches every per-device request
+    (`/{platform}/{serial}/...`) to the worker owning that serial, and
+    device-independent xpathLite requests to the workers in turn.
+
+    Args:
+    workers (List[str]): Worker base urls, e.g. ['http://127.0.0.1:8001'].
+    timeout (float): Seconds to wait for a worker response.
+
+    Returns:
+    APIRouter: The proxy router.
+    """
+    router = APIRouter()
+
+    def _send(req: urllib.request.Request, worker: str) -> Response:
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return _to_response(resp.status, resp.headers, resp.read())
+        except urllib.error.HTTPError as e:
+            return _to_response(e.code, e.headers, e.read())
+        except urllib.error.URLError as e:
+            logger.error(f"Worker<{worker}> unavailable: {e.reason}")
+            raise HTTPException(status_code=502, detail=f"Worker<{worker}> unavailable: {e.reason}")
+
+    async def _forward(worker: str, request: Request) -> Response:
+        url = f"{worker}{request.url.path}"
+        if request.url.query:
+            url += f"?{request.url.query}"
+
+        body = await request.body()
+        headers = {k: v for k, v in request.headers.items() if k.lower() in _FORWARD_HEADERS}
+        req = urllib.request.Request(url, data=body or None, headers=headers, method=request.method)
+        return await run_in_threadpool(_send, req, worker)
+
+    # xpathLite is not tied to a device and would otherwise match the per-device
+    # route below with serial "hierarchy", pinning all of it to one worker
+    rotation = itertools.cycle(workers)
+
+    @router.post("/{platform}/hierarchy/xpathLite")
+    async def forward_xpath_lite(platform: str, request: Request):
+        return await _forward(next(rotation), request)
+
+    @router.api_route("/{platform}/{serial}/{action:path}", methods=["GET", "POST"])
+    async def forward(platform: str, serial: str, action: str, request: Request):
+        return await _forward(pick_worker(workers, serial), request)
+
+    return router
+
+
+def _to_response(status: int, headers, content: bytes) -> Response:
+    kept = {k: v for k, v in headers.items() if k.lower() in _RETURN_HEADERS}
+    return Response(content=content, status_code=status, headers=kept)
@@ -4,7 +4,22 @@ async function checkResponse(response) {
   if (response.status === 500) {
     throw new Error('Server error: 500');
   }
-  return response.json();
+  if (response.status === 304) {
+    return {
+      success: true,
+      notModified: true,
+      etag: response.headers.get('ETag'),
+      snapshotId: response.headers.get('X-Snapshot-Id')
+    };
+  }
+  const data = await response.json();
+  data.etag = response.headers.get('ETag');
+  data.snapshotId = response.headers.get('X-Snapshot-Id');
+  return data;
+}
+
+function conditionalHeaders(etag) {
+  return etag ? { 'If-None-Match': etag } : {};
 }
 
 export async function getVersion() {
@@ -41,13 +56,21 @@ export async function connectDevice(platform, serial, wdaUrl, maxDepth) {
   return checkResponse(response);
 }
 
-export async function fetchScreenshot(platform, serial) {
-  const response = await fetch(`${API_HOST}${platform}/${serial}/screenshot`);
+export async function fetchScreenshot(platform, serial, etag) {
+  const response = await fetch(`${API_HOST}${platform}/${serial}/screenshot`, {
+    headers: conditionalHeaders(etag)
+  });
   return checkResponse(response);
 }
 
-export async function fetchHierarchy(platform, serial) {
-  const response = await fetch(`${API_HOST}${platform}/${serial}/hierarchy`);
+export async function fetchHierarchy(platform, serial, etag, snapshotId) {
+  let url = `${API_HOST}${platform}/${serial}/hierarchy`;
+  if (snapshotId) {
+    url += `?snapshotId=${encodeURIComponent(snapshotId)}`;
+  }
+  const response = await fetch(url, {
+    headers: conditionalHeaders(etag)
+  });
   return checkResponse(response);
 }
 
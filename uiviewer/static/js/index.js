@@ -22,6 +22,9 @@ new Vue({
       scale: getFromLocalStorage('scale', 1),
       screenshotTransform: {scale: 1, offsetX: 0, offsetY: 0},
       jsonHierarchy: {},
+      screenshotEtag: null,
+      snapshotId: null,
+      hierarchyEtag: null,
       xpathLite: "//",
       mouseClickCoordinatesPercent: null,
       hoveredNode: null,
@@ -121,6 +124,9 @@ new Vue({
         const response = await connectDevice(this.platform, this.serial, this.wdaUrl, this.snapshotMaxDepth);
         if (response.success) {
           this.isConnected = true;
+          this.screenshotEtag = null;
+          this.snapshotId = null;
+          this.hierarchyEtag = null;
           await this.screenshotAndDumpHierarchy();
         } else {
           throw new Error(response.message);
@@ -144,8 +150,13 @@ new Vue({
     },
     async fetchScreenshot() {
       try {
-        const response = await fetchScreenshot(this.platform, this.serial);
+        const response = await fetchScreenshot(this.platform, this.serial, this.screenshotEtag);
         if (response.success) {
+          this.snapshotId = response.snapshotId;
+          if (response.notModified) {
+            return;
+          }
+          this.screenshotEtag = response.etag;
           const base64Data = response.data;
           this.renderScreenshot(base64Data);
           saveToLocalStorage('cachedScreenshot', base64Data);
@@ -158,8 +169,12 @@ new Vue({
     },
     async fetchHierarchy() {
       try {
-        const response = await fetchHierarchy(this.platform, this.serial);
+        const response = await fetchHierarchy(this.platform, this.serial, this.hierarchyEtag, this.snapshotId);
         if (response.success) {
+          if (response.notModified) {
+            return;
+          }
+          this.hierarchyEtag = response.etag;
           const ret = response.data;
           this.packageName = ret.packageName;
           this.activityName = ret.activityName;